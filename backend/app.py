@@ -4,9 +4,13 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+from bisect import bisect_right
 from datetime import datetime, timedelta
 import stripe
-from sqlalchemy import or_, and_, cast, String
+from sqlalchemy import or_, and_, cast, String, select, insert, update, delete, union_all, literal, event, inspect, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.functions import aggregate_strings
 from sqlalchemy.types import JSON
 from sqlalchemy import extract
 from collections import Counter
@@ -20,6 +24,9 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:/
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-key'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+# Order archival: delivered orders older than this move to the archive tables
+app.config['ORDER_ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', 90))
+app.config['ORDER_ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', 500))
 
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
@@ -46,13 +53,26 @@ class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False)
-    stock = db.Column(db.Integer, default=0)
-    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    # active_history: update_product_facets needs the old values even on expired instances
+    price = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    stock = db.column_property(db.Column(db.Integer, default=0), active_history=True)
+    category_id = db.column_property(db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False), active_history=True)
     image_url = db.Column(db.String(300))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     original_price = db.Column(db.Float, nullable=True)  # New: store original/sample price
     price_change_history = db.Column(JSON, default=list)  # New: store last 5 price changes
+    __table_args__ = (
+        # Every PRODUCT_SORTS key (and the default id order), alone or within a category_id,
+        # has an index; id is the tie-break so sorted pages come straight off the index.
+        # A price range is served by the price indexes, so with a non-price sort the matches are sorted.
+        db.Index('ix_product_category_id', 'category_id', 'id'),
+        db.Index('ix_product_category_price', 'category_id', 'price', 'id'),
+        db.Index('ix_product_category_name', 'category_id', 'name', 'id'),
+        db.Index('ix_product_category_created_at', 'category_id', 'created_at', 'id'),
+        db.Index('ix_product_price', 'price', 'id'),
+        db.Index('ix_product_name', 'name', 'id'),
+        db.Index('ix_product_created_at', 'created_at', 'id'),
+    )
 
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -60,14 +80,46 @@ class Order(db.Model):
     total = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, paid, shipped, delivered
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # sqlite_autoincrement: never reuse the id of an order that has been archived
+    __table_args__ = (db.Index('ix_order_status_created_at', 'status', 'created_at'), {'sqlite_autoincrement': True})
 
 class OrderItem(db.Model):
+    __table_args__ = {'sqlite_autoincrement': True}
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'))
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'))
+    quantity = db.Column(db.Integer, nullable=False)
+    price = db.Column(db.Float, nullable=False)
+
+# Cold storage for delivered orders, filled by archive_delivered_orders(). Ids are kept.
+class ArchivedOrder(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    total = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedOrderItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('archived_order.id'), index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'))
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)
 
+# Product counts per (category, price bucket, in stock) cell, kept current by
+# update_product_facets() so filter sidebars never GROUP BY the catalog
+class ProductFacet(db.Model):
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    price_bucket = db.Column(db.Integer, primary_key=True, autoincrement=False)  # index into PRICE_BUCKETS
+    in_stock = db.Column(db.Boolean, primary_key=True)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+
+# Per-hour order counts of the archive, so analytics never have to scan it
+class OrderArchiveRollup(db.Model):
+    hour = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
 class ProductImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
@@ -75,12 +127,216 @@ class ProductImage(db.Model):
 
 Product.images = db.relationship('ProductImage', backref='product', lazy=True, cascade='all, delete-orphan')
 
+# Product facets
+PRICE_BUCKETS = [0, 25, 50, 100, 250, 500, 1000]  # lower bounds; the last bucket is open-ended
+
+def parse_number(value, type_):
+    try:
+        return type_(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+def price_bucket(price):
+    return max(bisect_right(PRICE_BUCKETS, price or 0) - 1, 0)
+
+def product_facet_key(category_id, price, stock):
+    # The UI sends price/stock (and sometimes category_id) as strings
+    category_id = parse_number(category_id, int)
+    if category_id is None:
+        return None
+    return (category_id, price_bucket(parse_number(price, float)), (parse_number(stock, float) or 0) > 0)
+
+def dialect_insert(session):
+    # insert() with on_conflict_do_update for the two backends the app runs on
+    return postgresql.insert if session.get_bind().dialect.name == 'postgresql' else sqlite.insert
+
+def committed_value(obj, attr):
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+@event.listens_for(db.session, 'before_flush')
+def update_product_facets(session, flush_context, instances):
+    deltas = Counter()
+    for p in session.new:
+        if isinstance(p, Product):
+            deltas[product_facet_key(p.category_id, p.price, p.stock)] += 1
+    for p in session.deleted:
+        if isinstance(p, Product):
+            deltas[product_facet_key(*(committed_value(p, a) for a in ('category_id', 'price', 'stock')))] -= 1
+    for p in session.dirty:
+        if isinstance(p, Product) and p not in session.deleted:
+            old = product_facet_key(*(committed_value(p, a) for a in ('category_id', 'price', 'stock')))
+            new = product_facet_key(p.category_id, p.price, p.stock)
+            if old != new:
+                deltas[old] -= 1
+                deltas[new] += 1
+    # Upsert so concurrent first writes to a cell cannot collide; counts never go below zero
+    facets = ProductFacet.__table__
+    upsert_insert = dialect_insert(session)
+    for key, delta in deltas.items():
+        if key is None or delta == 0:
+            continue
+        category_id, bucket, in_stock = key
+        new_count = facets.c.product_count + delta
+        session.execute(
+            upsert_insert(facets)
+            .values(category_id=category_id, price_bucket=bucket, in_stock=in_stock, product_count=max(delta, 0))
+            .on_conflict_do_update(
+                index_elements=[facets.c.category_id, facets.c.price_bucket, facets.c.in_stock],
+                set_={'product_count': case((new_count < 0, 0), else_=new_count)}
+            )
+        )
+
+def rebuild_product_facets():
+    # Full recount, for databases created before the facet table existed
+    counts = Counter(
+        product_facet_key(category_id, price, stock)
+        for category_id, price, stock in db.session.execute(select(Product.category_id, Product.price, Product.stock))
+    )
+    db.session.execute(delete(ProductFacet))
+    for (category_id, bucket, in_stock), count in counts.items():
+        db.session.add(ProductFacet(category_id=category_id, price_bucket=bucket, in_stock=in_stock, product_count=count))
+    db.session.commit()
+
+def facets_from_rows(rows, category_id=None, in_stock=False):
+    # Category counts honour the in_stock filter; price bucket counts honour category and in_stock
+    categories = Counter()
+    buckets = Counter()
+    for f in rows:
+        if in_stock and not f.in_stock:
+            continue
+        categories[f.category_id] += f.product_count
+        if category_id is None or f.category_id == category_id:
+            buckets[f.price_bucket] += f.product_count
+    return {
+        'categories': [{'category_id': c, 'count': n} for c, n in sorted(categories.items()) if n > 0],
+        'price_buckets': [{
+            'min': low,
+            'max': PRICE_BUCKETS[i + 1] if i + 1 < len(PRICE_BUCKETS) else None,
+            'count': buckets.get(i, 0)
+        } for i, low in enumerate(PRICE_BUCKETS)]
+    }
+
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'static', 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Search filters shared by the sync app and the async read API (async_app.py)
+def product_search_filters(search):
+    filters = []
+    for term in [t for t in search.split() if t]:
+        like_term = f"%{term.lower()}%"
+        filters.append(or_(
+            cast(Product.id, String).ilike(like_term),
+            Product.name.ilike(like_term),
+            Product.description.ilike(like_term),
+            cast(Product.price, String).ilike(like_term),
+            cast(Product.stock, String).ilike(like_term),
+            cast(Product.category_id, String).ilike(like_term),
+            Product.image_url.ilike(like_term)
+        ))
+    return filters
+
+# The id tie-break follows the sort direction so the matching index can be scanned backwards
+PRODUCT_SORTS = {
+    'price_asc': [Product.price.asc(), Product.id.asc()],
+    'price_desc': [Product.price.desc(), Product.id.desc()],
+    'name': [Product.name.asc(), Product.id.asc()],
+    'newest': [Product.created_at.desc(), Product.id.desc()],
+}
+
+def product_listing_filters(args):
+    """Filters for GET /api/products from its query args (a Flask or Starlette mapping).
+
+    Supports search (free text), category_id, min_price, max_price and in_stock.
+    """
+    filters = product_search_filters(args.get('search', '').strip())
+    category_id = parse_number(args.get('category_id'), int)
+    min_price = parse_number(args.get('min_price'), float)
+    max_price = parse_number(args.get('max_price'), float)
+    if category_id is not None:
+        filters.append(Product.category_id == category_id)
+    if min_price is not None:
+        filters.append(Product.price >= min_price)
+    if max_price is not None:
+        filters.append(Product.price <= max_price)
+    if is_truthy(args.get('in_stock', 'false')):
+        filters.append(Product.stock > 0)
+    return filters
+
+def product_listing_order(args):
+    return PRODUCT_SORTS.get(args.get('sort', ''), [Product.id])
+
+def product_facets_for(args, rows):
+    return facets_from_rows(rows, parse_number(args.get('category_id'), int), is_truthy(args.get('in_stock', 'false')))
+
+def order_search_filters(search, model=None):
+    # model is Order (hot set) or ArchivedOrder; both share the searched columns
+    model = model or Order
+    filters = []
+    for term in [t for t in search.split() if t]:
+        like_term = f"%{term.lower()}%"
+        filters.append(or_(
+            cast(model.id, String).ilike(like_term),
+            cast(model.user_id, String).ilike(like_term),
+            cast(model.total, String).ilike(like_term),
+            model.status.ilike(like_term),
+            cast(model.created_at, String).ilike(like_term)
+        ))
+    return filters
+
+def orders_listing_subquery(search='', include_archived=False):
+    # Hot orders only by default; include_archived adds the archive via UNION ALL
+    models = [Order, ArchivedOrder] if include_archived else [Order]
+    selects = [
+        select(m.id, m.user_id, m.total, m.status, m.created_at).where(*order_search_filters(search, m))
+        for m in models
+    ]
+    return (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+def hot_order_hours_select():
+    hour = extract('hour', Order.created_at)
+    return select(hour, db.func.count(Order.id)).where(Order.created_at.isnot(None)).group_by(hour)
+
+def is_truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+# Response schemas shared by the sync app and the async read API (async_app.py)
+def product_to_dict(p):
+    return {
+        'id': p.id,
+        'name': p.name,
+        'description': p.description,
+        'price': p.price,
+        'stock': p.stock,
+        'category_id': p.category_id,
+        'image_url': p.image_url
+    }
+
+def order_to_dict(o):
+    return {
+        'id': o.id,
+        'user_id': o.user_id,
+        'total': o.total,
+        'status': o.status,
+        'created_at': o.created_at.isoformat()
+    }
+
+def last_order_to_dict(o, user_email):
+    return {
+        'id': o.id,
+        'user': user_email or 'N/A',
+        'total': o.total,
+        'status': o.status,
+        'created_at': o.created_at.isoformat() if o.created_at else ''
+    }
+
+def active_times_from_counts(counts):
+    # Return as list of {hour: int, count: int}
+    return [{'hour': h, 'count': counts.get(h, 0)} for h in range(24)]
+
 # Authentication routes
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -126,39 +382,16 @@ def login():
 def get_products():
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
-    search = request.args.get('search', '').strip()
-    query = Product.query
-    if search:
-        terms = [t for t in search.split() if t]
-        for term in terms:
-            like_term = f"%{term.lower()}%"
-            query = query.filter(
-                or_(
-                    cast(Product.id, String).ilike(like_term),
-                    Product.name.ilike(like_term),
-                    Product.description.ilike(like_term),
-                    cast(Product.price, String).ilike(like_term),
-                    cast(Product.stock, String).ilike(like_term),
-                    cast(Product.category_id, String).ilike(like_term),
-                    Product.image_url.ilike(like_term)
-                )
-            )
+    query = Product.query.filter(*product_listing_filters(request.args))
     total = query.count()
-    products = query.offset((page - 1) * per_page).limit(per_page).all()
+    products = query.order_by(*product_listing_order(request.args)).offset((page - 1) * per_page).limit(per_page).all()
     print(f"==> [Diagnostics] /api/products called. Returning {len(products)} products (page {page}, per_page {per_page}, total {total}).")
     for p in products:
         print(f"    Product: id={p.id}, name={p.name}, image_url={p.image_url}")
     return jsonify({
-        'items': [{
-            'id': p.id,
-            'name': p.name,
-            'description': p.description,
-            'price': p.price,
-            'stock': p.stock,
-            'category_id': p.category_id,
-            'image_url': p.image_url
-        } for p in products],
-        'total': total
+        'items': [product_to_dict(p) for p in products],
+        'total': total,
+        'facets': product_facets_for(request.args, ProductFacet.query.all())
     })
 
 @app.route('/api/products', methods=['POST'])
@@ -343,33 +576,17 @@ def get_orders():
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
     search = request.args.get('search', '').strip()
-    query = Order.query
-    if search:
-        terms = [t for t in search.split() if t]
-        for term in terms:
-            like_term = f"%{term.lower()}%"
-            query = query.filter(
-                or_(
-                    cast(Order.id, String).ilike(like_term),
-                    cast(Order.user_id, String).ilike(like_term),
-                    cast(Order.total, String).ilike(like_term),
-                    Order.status.ilike(like_term),
-                    cast(Order.created_at, String).ilike(like_term)
-                )
-            )
-    total = query.count()
-    orders = query.order_by(Order.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    include_archived = is_truthy(request.args.get('include_archived', 'false'))
+    listing = orders_listing_subquery(search, include_archived)
+    total = db.session.scalar(select(db.func.count()).select_from(listing))
+    orders = db.session.execute(
+        select(listing).order_by(listing.c.created_at.desc()).offset((page - 1) * per_page).limit(per_page)
+    ).all()
     print(f"==> [Diagnostics] /api/orders called (no auth). Returning {len(orders)} orders (page {page}, per_page {per_page}, total {total}).")
     for o in orders:
         print(f"    Order: id={o.id}, total={o.total}, status={o.status}, created_at={o.created_at}")
     return jsonify({
-        'items': [{
-            'id': o.id,
-            'user_id': o.user_id,
-            'total': o.total,
-            'status': o.status,
-            'created_at': o.created_at.isoformat()
-        } for o in orders],
+        'items': [order_to_dict(o) for o in orders],
         'total': total
     })
 
@@ -422,6 +639,120 @@ def update_order_status(order_id):
     
     return jsonify({'message': 'Order status updated successfully'})
 
+# Order archival
+def archive_delivered_orders(older_than_days=None, batch_size=None):
+    """Move delivered orders older than the cutoff, with their items, to the archive tables.
+
+    Runs in batches of batch_size orders, one transaction per batch, and returns
+    the number of orders archived. Must be called inside an app context.
+    """
+    if older_than_days is None:
+        older_than_days = app.config['ORDER_ARCHIVE_AFTER_DAYS']
+    if batch_size is None:
+        batch_size = app.config['ORDER_ARCHIVE_BATCH_SIZE']
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    eligible = (Order.status == 'delivered', Order.created_at < cutoff)
+    rollup = OrderArchiveRollup.__table__
+    archived = 0
+    while True:
+        # FOR UPDATE SKIP LOCKED (Postgres; SQLite serialises writers and ignores it)
+        # lets overlapping runs take disjoint batches
+        ids = db.session.scalars(
+            select(Order.id).where(*eligible).order_by(Order.id).limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            break
+        # Re-check the predicate: an order changed since the select stays hot
+        db.session.execute(insert(ArchivedOrder).from_select(
+            ['id', 'user_id', 'total', 'status', 'created_at', 'archived_at'],
+            select(Order.id, Order.user_id, Order.total, Order.status, Order.created_at, literal(datetime.utcnow()))
+            .where(Order.id.in_(ids), *eligible)
+        ))
+        moved = db.session.scalars(select(ArchivedOrder.id).where(ArchivedOrder.id.in_(ids))).all()
+        db.session.execute(insert(ArchivedOrderItem).from_select(
+            ['id', 'order_id', 'product_id', 'quantity', 'price'],
+            select(OrderItem.id, OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.price)
+            .where(OrderItem.order_id.in_(moved))
+        ))
+        for hour, count in db.session.execute(hot_order_hours_select().where(Order.id.in_(moved))).all():
+            db.session.execute(
+                dialect_insert(db.session)(rollup)
+                .values(hour=int(hour), order_count=count)
+                .on_conflict_do_update(index_elements=[rollup.c.hour], set_={'order_count': rollup.c.order_count + count})
+            )
+        db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(moved)))
+        db.session.execute(delete(Order).where(Order.id.in_(moved)))
+        db.session.commit()
+        archived += len(moved)
+    return archived
+
+def ensure_sqlite_order_ids():
+    """Rebuild SQLite order/order item tables created before archival with AUTOINCREMENT.
+
+    Without it SQLite hands out max(id) + 1 again once the newest rows are
+    archived, and the reused id collides with the archive copy.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as conn:
+        for table in (Order.__table__, OrderItem.__table__):
+            ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)).scalar()
+            if 'AUTOINCREMENT' in ddl.upper():
+                continue
+            print(f'==> [Diagnostics] Rebuilding table {table.name} with AUTOINCREMENT...')
+            quoted = conn.dialect.identifier_preparer.format_table(table)
+            rebuilt = f'"{table.name}_autoincrement"'
+            columns = ', '.join(f'"{c.name}"' for c in table.columns)
+            create = str(CreateTable(table).compile(dialect=conn.dialect)).strip()
+            conn.exec_driver_sql(create.replace(f'CREATE TABLE {quoted}', f'CREATE TABLE {rebuilt}', 1))
+            conn.exec_driver_sql(f'INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {quoted}')
+            conn.exec_driver_sql(f'DROP TABLE {quoted}')
+            conn.exec_driver_sql(f'ALTER TABLE {rebuilt} RENAME TO {quoted}')
+
+def ensure_indexes():
+    # create_all skips the indexes of tables that already exist
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def archived_order_count():
+    return db.session.scalar(select(db.func.sum(OrderArchiveRollup.order_count))) or 0
+
+@app.route('/api/orders/archive', methods=['POST'])
+@jwt_required()
+def archive_orders():
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+
+    if user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json(silent=True) or {}
+    params = {}
+    for key, minimum in (('older_than_days', 0), ('batch_size', 1)):
+        if data.get(key) is None:
+            continue
+        value = parse_number(data[key], int)
+        if value is None or value < minimum:
+            return jsonify({'error': f'{key} must be an integer of at least {minimum}.'}), 400
+        params[key] = value
+    archived = archive_delivered_orders(**params)
+    return jsonify({'message': f'Archived {archived} orders.', 'archived': archived})
+
+@app.cli.command('archive-orders')
+def archive_orders_command():
+    """Archive delivered orders older than ORDER_ARCHIVE_AFTER_DAYS."""
+    print(f'Archived {archive_delivered_orders()} orders.')
+
+@app.cli.command('rebuild-product-facets')
+def rebuild_product_facets_command():
+    """Recount the product facet table from the catalog."""
+    rebuild_product_facets()
+    print('Product facets rebuilt.')
+
 # Category routes
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
@@ -457,7 +788,8 @@ def create_category():
 def get_dashboard_stats():
     # For demo: always return stats
     total_products = Product.query.count()
-    total_orders = Order.query.count()
+    # Archived orders are counted from the rollup; they are all delivered, so paid revenue is unaffected
+    total_orders = Order.query.count() + archived_order_count()
     total_users = User.query.filter_by(role='customer').count()
     total_revenue = db.session.query(db.func.sum(Order.total)).filter_by(status='paid').scalar() or 0
     print(f"==> [Diagnostics] /api/dashboard/stats called (no auth). Products: {total_products}, Orders: {total_orders}, Users: {total_users}, Revenue: {total_revenue}")
@@ -474,24 +806,24 @@ def dashboard_last_orders():
     result = []
     for o in orders:
         user = User.query.get(o.user_id)
-        result.append({
-            'id': o.id,
-            'user': user.email if user else 'N/A',
-            'total': o.total,
-            'status': o.status,
-            'created_at': o.created_at.isoformat() if o.created_at else ''
-        })
+        result.append(last_order_to_dict(o, user.email if user else None))
     return jsonify({'orders': result})
 
 @app.route('/api/dashboard/active-times', methods=['GET'])
 def dashboard_active_times():
-    # Group orders by hour of day
-    orders = Order.query.all()
-    hours = [o.created_at.hour for o in orders if o.created_at]
-    counts = Counter(hours)
-    # Return as list of {hour: int, count: int}
-    result = [{'hour': h, 'count': counts.get(h, 0)} for h in range(24)]
-    return jsonify({'active_times': result})
+    # Group orders by hour of day: hot set in SQL, archive from its rollup
+    counts = Counter({int(h): c for h, c in db.session.execute(hot_order_hours_select()).all()})
+    counts.update({r.hour: r.order_count for r in OrderArchiveRollup.query.all()})
+    return jsonify({'active_times': active_times_from_counts(counts)})
+
+@app.route('/api/dashboard/summary', methods=['GET'])
+def dashboard_summary():
+    # Sync counterpart of the async summary: the sub-queries run one after another
+    return jsonify({
+        'stats': get_dashboard_stats().get_json(),
+        'last_orders': dashboard_last_orders().get_json()['orders'],
+        'active_times': dashboard_active_times().get_json()['active_times']
+    })
 
 @app.route('/api/reports/products', methods=['GET'])
 def report_products():
@@ -512,16 +844,34 @@ def report_products():
 
 @app.route('/api/reports/orders', methods=['GET'])
 def report_orders():
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Orders'
+    # One ordered UNION ALL query, streamed into a write-only workbook, so the
+    # archive is never loaded into memory at once
+    include_archived = is_truthy(request.args.get('include_archived', 'false'))
+    listing = orders_listing_subquery('', include_archived)
+    item_selects = [
+        select(m.order_id, (Product.name + ' x' + cast(m.quantity, String)).label('item')).join(Product, Product.id == m.product_id)
+        for m in ([OrderItem, ArchivedOrderItem] if include_archived else [OrderItem])
+    ]
+    items = (union_all(*item_selects) if len(item_selects) > 1 else item_selects[0]).subquery()
+    order_items = (
+        select(items.c.order_id, aggregate_strings(items.c.item, ', ').label('item_list'))
+        .group_by(items.c.order_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(listing, User.email, order_items.c.item_list)
+        .outerjoin(User, User.id == listing.c.user_id)
+        .outerjoin(order_items, order_items.c.order_id == listing.c.id)
+        .order_by(listing.c.created_at.desc())
+        .execution_options(yield_per=1000)
+    )
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Orders')
     ws.append(['Order ID', 'User', 'Total', 'Status', 'Created At', 'Items'])
-    for o in Order.query.order_by(Order.created_at.desc()).all():
-        user = User.query.get(o.user_id)
-        items = ', '.join([f"{item.product.name} x{item.quantity}" for item in o.items])
+    for o in rows:
         ws.append([
-            o.id, user.email if user else '', o.total, o.status,
-            o.created_at.isoformat() if o.created_at else '', items
+            o.id, o.email or '', o.total, o.status,
+            o.created_at.isoformat() if o.created_at else '', o.item_list or ''
         ])
     output = io.BytesIO()
     wb.save(output)
@@ -533,7 +883,12 @@ def initialize_database():
     with app.app_context():
         print('==> [Diagnostics] Creating all tables if not exist...')
         db.create_all()
+        ensure_sqlite_order_ids()
+        ensure_indexes()
         ensure_original_price()
+        if ProductFacet.query.count() == 0 and Product.query.count() > 0:
+            print('==> [Diagnostics] Building product facet counts...')
+            rebuild_product_facets()
 
         # Only add sample data if the database is empty (no products, categories, or orders)
         if Product.query.count() == 0 and Category.query.count() == 0 and Order.query.count() == 0:
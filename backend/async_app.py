@@ -0,0 +1,174 @@
+"""Optional asyncio serving mode for the read-heavy endpoints.
+
+Runs as an ASGI app (Starlette) on top of a SQLAlchemy asyncio engine, so a
+request waiting on the database no longer pins a worker thread. It reuses the
+models, search filters and response schemas from app.py; writes still go
+through the sync Flask app.
+
+Run with:
+    uvicorn async_app:app --host 0.0.0.0 --port 5001
+"""
+import asyncio
+import contextlib
+import os
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sqlalchemy import select, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app import (
+    app as flask_app, db, initialize_database,
+    User, Category, Product, ProductFacet, Order, OrderArchiveRollup,
+    product_listing_filters, product_listing_order, product_facets_for, orders_listing_subquery, hot_order_hours_select, is_truthy,
+    product_to_dict, order_to_dict, last_order_to_dict, active_times_from_counts,
+)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def async_database_url():
+    # ASYNC_DATABASE_URL wins; otherwise reuse the sync app's resolved URL
+    # (Flask-SQLAlchemy places relative sqlite paths under instance/).
+    if os.environ.get('ASYNC_DATABASE_URL'):
+        return make_url(os.environ['ASYNC_DATABASE_URL'])
+    with flask_app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver configured for database backend: {backend}')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+engine = create_async_engine(async_database_url(), pool_pre_ping=True)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+# Product routes
+async def get_products(request):
+    page = int(request.query_params.get('page', 1))
+    per_page = int(request.query_params.get('per_page', 20))
+    filters = product_listing_filters(request.query_params)
+    async with Session() as session:
+        total = await session.scalar(select(func.count(Product.id)).where(*filters))
+        products = (await session.scalars(
+            select(Product).where(*filters).order_by(*product_listing_order(request.query_params))
+            .offset((page - 1) * per_page).limit(per_page)
+        )).all()
+        facets = (await session.scalars(select(ProductFacet))).all()
+    return JSONResponse({
+        'items': [product_to_dict(p) for p in products],
+        'total': total,
+        'facets': product_facets_for(request.query_params, facets)
+    })
+
+# Order routes
+async def get_orders(request):
+    page = int(request.query_params.get('page', 1))
+    per_page = int(request.query_params.get('per_page', 20))
+    search = request.query_params.get('search', '').strip()
+    include_archived = is_truthy(request.query_params.get('include_archived', 'false'))
+    listing = orders_listing_subquery(search, include_archived)
+    async with Session() as session:
+        total = await session.scalar(select(func.count()).select_from(listing))
+        orders = (await session.execute(
+            select(listing).order_by(listing.c.created_at.desc())
+            .offset((page - 1) * per_page).limit(per_page)
+        )).all()
+    return JSONResponse({
+        'items': [order_to_dict(o) for o in orders],
+        'total': total
+    })
+
+# Category routes
+async def get_categories(request):
+    async with Session() as session:
+        categories = (await session.scalars(select(Category))).all()
+    return JSONResponse([{
+        'id': c.id,
+        'name': c.name,
+        'description': c.description
+    } for c in categories])
+
+# Dashboard analytics. Each query opens its own session: an AsyncSession must
+# not be shared between tasks that run concurrently.
+async def fetch_stats():
+    async with Session() as session:
+        total_products = await session.scalar(select(func.count(Product.id)))
+        total_orders = await session.scalar(select(func.count(Order.id)))
+        archived_orders = await session.scalar(select(func.sum(OrderArchiveRollup.order_count)))
+        total_users = await session.scalar(select(func.count(User.id)).where(User.role == 'customer'))
+        total_revenue = await session.scalar(select(func.sum(Order.total)).where(Order.status == 'paid'))
+    return {
+        'total_products': total_products,
+        'total_orders': total_orders + (archived_orders or 0),
+        'total_users': total_users,
+        'total_revenue': total_revenue or 0
+    }
+
+async def fetch_last_orders():
+    async with Session() as session:
+        rows = (await session.execute(
+            select(Order, User.email)
+            .outerjoin(User, User.id == Order.user_id)
+            .order_by(Order.created_at.desc())
+            .limit(5)
+        )).all()
+    return [last_order_to_dict(o, email) for o, email in rows]
+
+async def fetch_active_times():
+    async with Session() as session:
+        hot = (await session.execute(hot_order_hours_select())).all()
+        archived = (await session.scalars(select(OrderArchiveRollup))).all()
+    counts = Counter({int(h): c for h, c in hot})
+    counts.update({r.hour: r.order_count for r in archived})
+    return active_times_from_counts(counts)
+
+async def get_dashboard_stats(request):
+    return JSONResponse(await fetch_stats())
+
+async def dashboard_last_orders(request):
+    return JSONResponse({'orders': await fetch_last_orders()})
+
+async def dashboard_active_times(request):
+    return JSONResponse({'active_times': await fetch_active_times()})
+
+async def dashboard_summary(request):
+    stats, last_orders, active_times = await asyncio.gather(
+        fetch_stats(), fetch_last_orders(), fetch_active_times()
+    )
+    return JSONResponse({
+        'stats': stats,
+        'last_orders': last_orders,
+        'active_times': active_times
+    })
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Schema creation and sample data stay in the sync app
+    await asyncio.to_thread(initialize_database)
+    yield
+    await engine.dispose()
+
+app = Starlette(
+    routes=[
+        Route('/api/products', get_products, methods=['GET']),
+        Route('/api/orders', get_orders, methods=['GET']),
+        Route('/api/categories', get_categories, methods=['GET']),
+        Route('/api/dashboard/stats', get_dashboard_stats, methods=['GET']),
+        Route('/api/dashboard/last-orders', dashboard_last_orders, methods=['GET']),
+        Route('/api/dashboard/active-times', dashboard_active_times, methods=['GET']),
+        Route('/api/dashboard/summary', dashboard_summary, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5001)
@@ -0,0 +1,57 @@
+"""Compare how the sync (Flask) and async (Starlette) servers scale with concurrency.
+
+Start both servers, then run e.g.:
+    python loadtest.py --sync http://localhost:5000 --async http://localhost:5001
+
+For every concurrency level each endpoint is hit with that many parallel
+clients, and throughput plus p50/p95 latency are printed side by side.
+"""
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = [
+    '/api/dashboard/summary',
+    '/api/dashboard/stats',
+    '/api/products?page=1&per_page=20',
+]
+
+def timed_get(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+def run(base_url, path, concurrency, requests_per_client):
+    url = base_url.rstrip('/') + path
+    total = concurrency * requests_per_client
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(timed_get, [url] * total))
+    elapsed = time.perf_counter() - start
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync', dest='sync_url', default='http://localhost:5000')
+    parser.add_argument('--async', dest='async_url', default='http://localhost:5001')
+    parser.add_argument('--concurrency', default='1,8,32,64', help='comma separated levels')
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    print(f"{'endpoint':<36}{'conc':>6}  {'mode':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for path in ENDPOINTS:
+        for concurrency in levels:
+            for mode, base_url in (('sync', args.sync_url), ('async', args.async_url)):
+                r = run(base_url, path, concurrency, args.requests)
+                print(f"{path:<36}{concurrency:>6}  {mode:<6}{r['rps']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.py reads its configuration at import time
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend
+
+
+@pytest.fixture
+def app_module():
+    with backend.app.app_context():
+        backend.db.drop_all()
+    backend.initialize_database()
+    backend._initialized = True
+    with backend.app.app_context():
+        yield backend
+        backend.db.session.remove()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+httpx = pytest.importorskip('httpx')
+
+
+def async_get_all(paths):
+    import async_app
+
+    async def run():
+        async with async_app.lifespan(async_app.app):
+            transport = httpx.ASGITransport(app=async_app.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return [await client.get(path) for path in paths]
+
+    return asyncio.run(run())
+
+
+def test_async_responses_match_sync_app(app_module, client):
+    m = app_module
+    for o in m.Order.query.order_by(m.Order.id).limit(4).all():
+        o.status = 'delivered'
+        o.created_at = o.created_at.replace(year=o.created_at.year - 1)
+    m.db.session.commit()
+    assert m.archive_delivered_orders() == 4
+    category_id = m.Category.query.first().id
+
+    paths = [
+        '/api/products',
+        f'/api/products?category_id={category_id}&min_price=20&max_price=900&in_stock=1&sort=price_desc',
+        '/api/products?search=book&sort=name&per_page=5',
+        '/api/orders',
+        '/api/orders?include_archived=true&per_page=100',
+        '/api/orders?include_archived=1&search=delivered',
+        '/api/categories',
+        '/api/dashboard/summary',
+    ]
+    for path, async_resp in zip(paths, async_get_all(paths)):
+        assert async_resp.status_code == 200, path
+        assert async_resp.json() == client.get(path).get_json(), path
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+
+def age_orders(m, orders, days=365):
+    for o in orders:
+        o.status = 'delivered'
+        o.created_at = datetime.utcnow() - timedelta(days=days)
+    m.db.session.commit()
+
+
+def make_legacy_tables(m):
+    # Recreate order/order_item the way the baseline created them: no AUTOINCREMENT
+    m.db.session.remove()
+    with m.db.engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE order_legacy (id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER, total FLOAT NOT NULL, status VARCHAR(20), created_at DATETIME)')
+        conn.exec_driver_sql('INSERT INTO order_legacy SELECT id, user_id, total, status, created_at FROM "order"')
+        conn.exec_driver_sql('DROP TABLE "order"')
+        conn.exec_driver_sql('ALTER TABLE order_legacy RENAME TO "order"')
+        conn.exec_driver_sql('CREATE TABLE order_item_legacy (id INTEGER NOT NULL PRIMARY KEY, order_id INTEGER, product_id INTEGER, quantity INTEGER NOT NULL, price FLOAT NOT NULL)')
+        conn.exec_driver_sql('INSERT INTO order_item_legacy SELECT id, order_id, product_id, quantity, price FROM order_item')
+        conn.exec_driver_sql('DROP TABLE order_item')
+        conn.exec_driver_sql('ALTER TABLE order_item_legacy RENAME TO order_item')
+        conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name IN ('order', 'order_item')")
+
+
+def test_archive_keeps_totals_and_listings(app_module, client):
+    m = app_module
+    before = client.get('/api/dashboard/summary').get_json()
+    total = client.get('/api/orders').get_json()['total']
+    age_orders(m, m.Order.query.order_by(m.Order.id).limit(10).all())
+
+    assert m.archive_delivered_orders(batch_size=3) == 10
+    assert m.archive_delivered_orders() == 0
+    after = client.get('/api/dashboard/summary').get_json()
+    assert after['stats'] == client.get('/api/dashboard/stats').get_json()
+    assert after['stats']['total_orders'] == before['stats']['total_orders']
+    assert after['active_times'] != [] and sum(h['count'] for h in after['active_times']) == total
+    assert client.get('/api/orders').get_json()['total'] == total - 10
+    assert client.get('/api/orders?include_archived=true').get_json()['total'] == total
+
+
+def test_legacy_tables_do_not_reuse_archived_ids(app_module, client):
+    m = app_module
+    make_legacy_tables(m)
+    m.initialize_database()
+
+    with m.db.engine.connect() as conn:
+        for table in ('order', 'order_item'):
+            ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = ?", (table,)).scalar()
+            assert 'AUTOINCREMENT' in ddl
+    newest = m.Order.query.order_by(m.Order.id.desc()).first()
+    archived_id, user_id = newest.id, newest.user_id
+    age_orders(m, [newest])
+    assert m.archive_delivered_orders() == 1
+
+    fresh = m.Order(user_id=user_id, total=1, status='delivered', created_at=datetime.utcnow() - timedelta(days=365))
+    m.db.session.add(fresh)
+    m.db.session.commit()
+    assert fresh.id > archived_id
+    assert m.archive_delivered_orders() == 1
+    ids = [o['id'] for o in client.get('/api/orders?include_archived=1&per_page=1000').get_json()['items']]
+    assert len(ids) == len(set(ids))
+
+
+def test_indexes_created_on_existing_tables(app_module):
+    m = app_module
+    make_legacy_tables(m)
+    with m.db.engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_product_category_price')
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_product_price')
+
+    m.initialize_database()
+
+    inspector = m.inspect(m.db.engine)
+    for table in ('order', 'order_item', 'product'):
+        existing = {i['name'] for i in inspector.get_indexes(table)}
+        assert {i.name for i in m.db.metadata.tables[table].indexes} <= existing
+
+
+def test_archive_endpoint_validates_parameters(app_module, client):
+    m = app_module
+    admin = m.User.query.filter_by(role='admin').first()
+    headers = {'Authorization': f'Bearer {m.create_access_token(identity=str(admin.id))}'}
+    # Sample orders go back at most 30 days, so only these two are older than 35
+    age_orders(m, m.Order.query.order_by(m.Order.id).limit(2).all(), days=40)
+
+    for payload in ({'batch_size': 0}, {'batch_size': -5}, {'older_than_days': 'soon'}, {'older_than_days': -1}):
+        assert client.post('/api/orders/archive', json=payload, headers=headers).status_code == 400
+
+    resp = client.post('/api/orders/archive', json={'older_than_days': '35', 'batch_size': '1'}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json()['archived'] == 2
+
+
+def test_order_changed_mid_batch_stays_hot(app_module):
+    m = app_module
+    orders = m.Order.query.order_by(m.Order.id).limit(3).all()
+    age_orders(m, orders)
+    changed_id = orders[0].id
+    m.db.session.expire_all()
+
+    def reopen_order(state):
+        # Another writer moves the order on after the batch was selected
+        if state.is_insert and state.statement.table.name == 'archived_order':
+            state.session.connection().execute(
+                m.update(m.Order.__table__).where(m.Order.__table__.c.id == changed_id).values(status='returned')
+            )
+
+    m.event.listen(m.db.session, 'do_orm_execute', reopen_order)
+    try:
+        assert m.archive_delivered_orders() == 2
+    finally:
+        m.event.remove(m.db.session, 'do_orm_execute', reopen_order)
+    assert m.db.session.get(m.Order, changed_id).status == 'returned'
+    assert m.db.session.get(m.ArchivedOrder, changed_id) is None
+    assert m.OrderItem.query.filter_by(order_id=changed_id).count() > 0
+    assert sum(r.order_count for r in m.OrderArchiveRollup.query.all()) == 2
+
+
+def test_orders_report_streams_hot_and_archived_orders(app_module, client):
+    import io
+
+    import openpyxl
+
+    m = app_module
+    age_orders(m, m.Order.query.order_by(m.Order.id).limit(5).all())
+    m.archive_delivered_orders()
+    hot = m.Order.query.count()
+
+    def report_rows(query=''):
+        resp = client.get(f'/api/reports/orders{query}')
+        assert resp.status_code == 200
+        return list(openpyxl.load_workbook(io.BytesIO(resp.data)).active.iter_rows(min_row=2, values_only=True))
+
+    assert len(report_rows()) == hot
+    rows = report_rows('?include_archived=true')
+    assert len(rows) == hot + 5
+    created = [r[4] for r in rows]
+    assert created == sorted(created, reverse=True)
+    archived_row = next(r for r in rows if r[0] == m.ArchivedOrder.query.first().id)
+    assert archived_row[1] and ' x' in archived_row[5]
@@ -0,0 +1,92 @@
+from collections import Counter
+
+from sqlalchemy import text
+
+
+def facet_table(m):
+    return +Counter({(f.category_id, f.price_bucket, f.in_stock): f.product_count for f in m.ProductFacet.query.all()})
+
+
+def recount(m):
+    return Counter(m.product_facet_key(p.category_id, p.price, p.stock) for p in m.Product.query.all())
+
+
+def test_facets_follow_string_typed_payloads(app_module, client):
+    m = app_module
+    category_id = m.Category.query.first().id
+    resp = client.post('/api/products', json={
+        'name': 'Notebook', 'description': 'Lined', 'price': '12.5', 'stock': '3', 'category_id': category_id
+    })
+    assert resp.status_code == 201
+    m.db.session.expire_all()
+    assert facet_table(m) == recount(m)
+
+    product = m.db.session.get(m.Product, resp.get_json()['id'])
+    product.price = '1200'
+    product.stock = '0'
+    m.db.session.commit()
+    m.db.session.expire_all()
+    assert facet_table(m) == recount(m)
+
+
+def test_facets_follow_price_changes_and_deletes(app_module, client):
+    m = app_module
+    assert client.post('/api/products/bulk-update-prices', json={'percent': 50}).status_code == 200
+    assert client.post('/api/products/bulk-discount', json={'amount': 100}).status_code == 200
+    assert client.delete(f'/api/products/{m.Product.query.first().id}').status_code == 200
+    m.db.session.expire_all()
+    assert facet_table(m) == recount(m)
+
+
+def test_structured_filters_and_facets(app_module, client):
+    m = app_module
+    category_id = m.Category.query.first().id
+    data = client.get(f'/api/products?category_id={category_id}&min_price=50&in_stock=1&sort=price_desc&per_page=100').get_json()
+    prices = [p['price'] for p in data['items']]
+    assert data['total'] == len(prices) > 0
+    assert prices == sorted(prices, reverse=True)
+    assert all(p['category_id'] == category_id and p['price'] >= 50 and p['stock'] > 0 for p in data['items'])
+    in_category = sum(b['count'] for b in data['facets']['price_buckets'])
+    assert in_category == m.Product.query.filter(m.Product.category_id == category_id, m.Product.stock > 0).count()
+
+
+def test_stale_facet_table_never_goes_negative(app_module, client):
+    m = app_module
+    m.ProductFacet.query.delete()
+    m.db.session.commit()
+    assert client.delete(f'/api/products/{m.Product.query.first().id}').status_code == 200
+    m.db.session.expire_all()
+    assert all(f.product_count >= 0 for f in m.ProductFacet.query.all())
+    data = client.get('/api/products').get_json()
+    assert all(b['count'] >= 0 for b in data['facets']['price_buckets'])
+
+
+def test_sorts_are_served_by_indexes(app_module):
+    m = app_module
+    category_id = m.Category.query.first().id
+    price_range = [m.Product.price >= 50, m.Product.price <= 500]
+    cases = [
+        (sort, filters)
+        for sort in [None, *m.PRODUCT_SORTS]
+        for filters in ([], [m.Product.category_id == category_id])
+    ]
+    cases += [
+        (sort, [*filters, *price_range])
+        for sort in ('price_asc', 'price_desc')
+        for filters in ([], [m.Product.category_id == category_id])
+    ]
+    for sort, filters in cases:
+        stmt = m.select(m.Product).where(*filters).order_by(*m.product_listing_order({'sort': sort or ''})).limit(20)
+        sql = str(stmt.compile(m.db.engine, compile_kwargs={'literal_binds': True}))
+        plan = ' '.join(row[-1] for row in m.db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+        assert 'TEMP B-TREE' not in plan, (sort, sql, plan)
+
+
+def test_facets_follow_writes_to_expired_products(app_module):
+    m = app_module
+    product = m.Product.query.filter(m.Product.price > 100).first()
+    m.db.session.commit()  # expires product, so the write below has no loaded old value
+    product.price = 1.0
+    m.db.session.commit()
+    m.db.session.expire_all()
+    assert facet_table(m) == recount(m)